@@ -4,37 +4,188 @@ Genesis Performance Monitoring Module
 Tracks response times, correctness, fallbacks, and system health
 """
 
+import atexit
+import io
 import json
+import os
 import time
+from collections import deque
 from datetime import datetime
 from pathlib import Path
+from itertools import islice
+from queue import Empty, SimpleQueue
 from typing import Dict, Any, Optional, List
-from threading import Lock
-import statistics
+from threading import Event, Lock, Thread
+
+# Compact UTF-8 JSON for the metrics file and query log (same output with
+# or without orjson); pretty=True indents it for human-readable exports.
+# Values JSON can't represent (e.g. numpy scalars) are stored as str()
+try:
+    import orjson
+
+    def _dumps(obj, pretty: bool = False) -> bytes:
+        return orjson.dumps(obj, default=str, option=orjson.OPT_INDENT_2 if pretty else 0)
+except ImportError:
+    def _dumps(obj, pretty: bool = False) -> bytes:
+        if pretty:
+            return json.dumps(obj, indent=2, ensure_ascii=False, default=str).encode('utf-8')
+        return json.dumps(obj, separators=(',', ':'), ensure_ascii=False, default=str).encode('utf-8')
+
+# Longest user input / error message stored per record
+_MAX_TEXT_CHARS = 200
+
+def _truncate(text: str) -> str:
+    """Clip text to _MAX_TEXT_CHARS, skipping the slice for short strings"""
+    return text if len(text) <= _MAX_TEXT_CHARS else text[:_MAX_TEXT_CHARS]
+
+# Summary report templates (filled with str.format_map)
+_REPORT_TEMPLATE = """
+╔══════════════════════════════════════════════════════════════╗
+║           🧬 GENESIS PERFORMANCE METRICS                      ║
+╚══════════════════════════════════════════════════════════════╝
+
+📊 OVERALL STATISTICS
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+Total Queries Processed:        {total_queries}
+  • Direct Commands (instant):  {direct_commands}
+  • LLM Queries (20-30s):        {llm_queries}
+
+🌐 RESPONSE SOURCES
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+  🧬 Local (Genesis):           {source_counts[local]}
+  🔍 Perplexity Research:       {source_counts[perplexity]}
+  ☁️  Claude Fallback:           {source_counts[claude]}
+
+⚡ RESPONSE SPEED
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+Average Response Time:          {avg_response_time_ms:.2f} ms
+Recent (Last 10):
+  • Fastest:                    {min_time:.2f} ms
+  • Slowest:                    {max_time:.2f} ms
+  • Average:                    {avg_recent:.2f} ms
+
+✅ USER FEEDBACK
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+Total Feedback Given:           {total_feedback}
+  ✓ Correct (#correct):         {correct} ({correct_pct:.1f}%)
+  ✗ Incorrect (#incorrect):     {incorrect} ({incorrect_pct:.1f}%)
+
+🤖 CLAUDE FALLBACK
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+Total Fallbacks:                {total_fallbacks}
+Fallback Rate:                  {fallback_rate:.1f}%
+Recent Fallbacks:               {recent_fallbacks}
+"""
+
+_ERRORS_TEMPLATE = """
+⚠️  ERRORS & ISSUES
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+Total Errors:                   {total_errors}
+Recent Errors (Last 5):
+"""
+
+_REPORT_FOOTER = (
+    "\n━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n"
+    "Commands: #correct | #incorrect | #performance | #reset_metrics\n"
+)
 
 class PerformanceMonitor:
     """Autonomous performance tracking and monitoring system"""
 
-    def __init__(self, metrics_file: str = "data/genesis_metrics.json"):
+    def __init__(
+        self,
+        metrics_file: str = "data/genesis_metrics.json",
+        flush_interval: float = 0.5,
+        max_queries: int = 100
+    ):
         """
         Initialize performance monitor
 
         Args:
             metrics_file: Path to metrics storage file
+            flush_interval: Seconds to batch events before writing metrics to disk
+            max_queries: Recent query records kept in the metrics file; older
+                ones are appended to the JSONL query log
         """
         self.metrics_file = Path(metrics_file)
         self.metrics_file.parent.mkdir(parents=True, exist_ok=True)
 
-        # Thread-safe lock for concurrent access
+        # Recording methods only enqueue events; whoever holds the lock
+        # (flusher or a reader) applies them to the metrics in order
         self._lock = Lock()
+        self._write_lock = Lock()  # Serializes file writes (flusher vs. atexit)
+        self._events = SimpleQueue()
+
+        # Cached "YYYY-MM-DDTHH:MM:SS" prefix for the current wall-clock second
+        self._ts_cache = (None, "")
 
         # Current session tracking
         self._current_query_start: Optional[float] = None
         self._last_query_id: Optional[str] = None
         self._last_response: Optional[str] = None
 
-        # Load existing metrics
+        # The metrics file only holds the most recent max_queries records so
+        # it stays small to load; older records go to an append-only JSONL log
+        self._archive_file = self.metrics_file.with_suffix(".queries.jsonl")
+        self._archive = None
+
+        # Load existing metrics (query records live in a bounded deque)
         self.metrics = self._load_metrics()
+        queries = self.metrics.pop("queries", [])
+        trimmed = len(queries) > max_queries
+        if trimmed:
+            for record in queries[:-max_queries]:
+                self._archive_query(record)
+            if self._archive is not None:
+                self._archive.flush()
+        self._queries = deque(queries[-max_queries:], maxlen=max_queries)
+
+        # Backfill counters for metrics files saved before they were tracked
+        stats = self.metrics["statistics"]
+        if "direct_commands" not in stats:
+            stats["direct_commands"] = sum(1 for q in queries if q["was_direct_command"])
+        if "source_counts" not in stats:
+            source_counts = {"local": 0, "perplexity": 0, "claude": 0}
+            for q in queries:
+                source = q.get("source", "local")
+                source_counts[source] = source_counts.get(source, 0) + 1
+            stats["source_counts"] = source_counts
+
+        # Side cache of the last 10 response times (not persisted)
+        self._recent_times = deque(
+            (q["response_time_ms"] for q in islice(self._queries, max(0, len(self._queries) - 10), None)),
+            maxlen=10
+        )
+
+        # Batched persistence: a background thread sleeps until something is
+        # recorded, then waits one flush interval so a burst becomes one write
+        self._flush_interval = flush_interval
+        self._dirty = Event()   # Metrics changed since the last write
+        self._wake = Event()    # Something was recorded; wakes the flusher
+        self._closed = Event()
+        self._flush_thread = Thread(target=self._flush_loop, daemon=True)
+        self._flush_thread.start()
+        atexit.register(self._flush_sync)
+
+        # Persist the trimmed metrics file so records archived above are not
+        # archived again on the next start
+        if trimmed:
+            self._save_metrics()
+
+    def close(self):
+        """Write pending metrics and stop the background flusher"""
+        if self._closed.is_set():
+            return
+        self._closed.set()
+        self._wake.set()
+        self._flush_thread.join()
+        atexit.unregister(self._flush_sync)
+        self._flush_sync()
+
+        with self._write_lock, self._lock:
+            if self._archive is not None:
+                self._archive.close()
+                self._archive = None
 
     def _load_metrics(self) -> Dict[str, Any]:
         """
@@ -63,19 +214,239 @@ class PerformanceMonitor:
                 "total_queries": 0,
                 "total_fallbacks": 0,
                 "total_errors": 0,
-                "avg_response_time_ms": 0.0
+                "avg_response_time_ms": 0.0,
+                "direct_commands": 0,
+                "source_counts": {"local": 0, "perplexity": 0, "claude": 0}
             },
             "session_start": datetime.now().isoformat()
         }
 
-    def _save_metrics(self):
-        """Save metrics to file (async-safe)"""
+    def _snapshot(self) -> Dict[str, Any]:
+        """Build the serializable metrics dict (caller must hold the lock)"""
+        return dict(self.metrics, queries=list(self._queries))
+
+    def _archive_query(self, record: Dict[str, Any]):
+        """Append an evicted query record to the JSONL archive"""
         try:
-            with self._lock:
-                with open(self.metrics_file, 'w') as f:
-                    json.dump(self.metrics, f, indent=2)
+            if self._archive is None:
+                self._archive = open(self._archive_file, 'ab')
+            self._archive.write(_dumps(record) + b'\n')
         except Exception as e:
-            print(f"⚠ Could not save metrics: {e}")
+            print(f"⚠ Could not archive query: {e}")
+
+    def _archive_end(self) -> int:
+        """
+        Flush the JSONL query log and return its size (caller must hold the lock)
+
+        Records appended after this offset are still in the query deque, so
+        reading the log up to it and the deque gives each record exactly once
+        """
+        if self._archive is not None:
+            self._archive.flush()
+            return self._archive.tell()
+        try:
+            return self._archive_file.stat().st_size
+        except FileNotFoundError:
+            return 0
+
+    def _read_archive(self, end: int) -> List[Dict[str, Any]]:
+        """
+        Read every record of the JSONL query log up to a byte offset
+
+        Args:
+            end: Offset returned by _archive_end
+
+        Returns:
+            List of query records, oldest first
+        """
+        if end <= 0:
+            return []
+
+        with open(self._archive_file, 'rb') as f:
+            data = f.read(end)
+        return [json.loads(line) for line in data.splitlines() if line]
+
+    def _read_archive_tail(self, count: int, end: int) -> List[Dict[str, Any]]:
+        """
+        Read the last records of the JSONL query log without loading it all
+
+        Args:
+            count: Number of records to return
+            end: Offset returned by _archive_end
+
+        Returns:
+            List of query records, oldest first
+        """
+        if count <= 0 or end <= 0:
+            return []
+
+        with open(self._archive_file, 'rb') as f:
+            pos = end
+            block = max(4096, count * 512)
+            data = b''
+            while pos > 0 and data.count(b'\n') <= count:
+                step = min(block, pos)
+                pos -= step
+                f.seek(pos)
+                data = f.read(step) + data
+
+        lines = data.splitlines()
+        if pos > 0:
+            lines = lines[1:]  # First line may be partial
+        return [json.loads(line) for line in lines[-count:] if line]
+
+    def _save_metrics(self):
+        """Schedule metrics to be saved by the background flusher (non-blocking)"""
+        self._dirty.set()
+        self._wake.set()
+
+    def _apply_event(self, kind: str, record: Any):
+        """Apply one recorded event to the metrics (caller must hold the lock)"""
+        stats = self.metrics["statistics"]
+
+        if kind == "query":
+            # Add to queries deque, archiving the oldest record once full
+            if len(self._queries) == self._queries.maxlen:
+                self._archive_query(self._queries[0])
+            self._queries.append(record)
+            self._recent_times.append(record["response_time_ms"])
+
+            n = stats["total_queries"]
+            stats["total_queries"] = n + 1
+
+            if record["error"]:
+                stats["total_errors"] += 1
+
+            if record["was_direct_command"]:
+                stats["direct_commands"] += 1
+            source_counts = stats["source_counts"]
+            source_counts[record["source"]] = source_counts.get(record["source"], 0) + 1
+
+            # Update running average response time (O(1) per query)
+            stats["avg_response_time_ms"] = round(
+                (stats["avg_response_time_ms"] * n + record["response_time_ms"]) / (n + 1), 2
+            )
+
+        elif kind == "fallback":
+            self.metrics["fallbacks"].append(record)
+            stats["total_fallbacks"] += 1
+
+            # Update last query with fallback info
+            if self._queries:
+                self._queries[-1]["had_fallback"] = True
+                self._queries[-1]["fallback_success"] = record["success"]
+
+        elif kind == "error":
+            self.metrics["errors"].append(record)
+            stats["total_errors"] += 1
+
+            # Keep only last 100 errors to prevent file bloat
+            if len(self.metrics["errors"]) > 100:
+                self.metrics["errors"] = self.metrics["errors"][-100:]
+
+        elif kind == "feedback":
+            feedback_type, note = record
+            self.metrics["feedback"][feedback_type] += 1
+
+            # Update last query with feedback and note
+            if self._queries:
+                self._queries[-1]["feedback"] = feedback_type
+                if note:
+                    self._queries[-1]["feedback_note"] = note
+
+    def _drain_events(self) -> int:
+        """
+        Apply all queued events and mark metrics dirty (caller must hold the lock)
+
+        Returns:
+            Number of events applied
+        """
+        applied = 0
+        while True:
+            try:
+                kind, record = self._events.get_nowait()
+            except Empty:
+                break
+            self._apply_event(kind, record)
+            applied += 1
+
+        if applied:
+            self._dirty.set()
+        return applied
+
+    def _post(self, kind: str, record: Any):
+        """Queue an event and wake the flusher (non-blocking, no metrics lock)"""
+        self._events.put_nowait((kind, record))
+        # Event.set() takes a lock, so only the first event after a flush
+        # pays for it. Safe because the flusher clears the flag before it
+        # drains the queue, and this event is queued before the check
+        if not self._wake.is_set():
+            self._wake.set()
+
+    def _flush_loop(self):
+        """Background thread that batches metric writes until close()"""
+        while True:
+            self._wake.wait()
+            if self._closed.wait(self._flush_interval):
+                return  # close() does the final write
+            self._wake.clear()
+            try:
+                self._flush_sync()
+            except Exception as e:
+                # Keep the flusher alive; the next event retries the write
+                print(f"⚠ Could not save metrics: {e}")
+
+    def _flush_sync(self):
+        """Apply queued events and write pending metrics to file atomically"""
+        # Serialize under the metrics lock, then write outside it so
+        # readers are never blocked on disk I/O
+        with self._write_lock:
+            with self._lock:
+                self._drain_events()
+                if not self._dirty.is_set():
+                    return
+                self._dirty.clear()
+                try:
+                    data = _dumps(self._snapshot())
+                except Exception as e:
+                    print(f"⚠ Could not save metrics: {e}")
+                    self._dirty.set()  # Retry on the next flush
+                    return
+
+            try:
+                # Flush records evicted into the query log before the trimmed
+                # file replaces the old one: a crash in between may duplicate
+                # a record but never loses one. The log handle only changes
+                # under the write lock (reset_metrics, close)
+                if self._archive is not None:
+                    self._archive.flush()
+                tmp_file = self.metrics_file.with_name(self.metrics_file.name + ".tmp")
+                with open(tmp_file, 'wb') as f:
+                    f.write(data)
+                os.replace(tmp_file, self.metrics_file)
+            except Exception as e:
+                print(f"⚠ Could not save metrics: {e}")
+                self._dirty.set()  # Retry on the next flush
+
+    def _timestamp(self, now: Optional[float] = None) -> str:
+        """
+        Format an ISO-8601 local timestamp, reusing the formatted date/time
+        prefix while events fall within the same second
+
+        Args:
+            now: Epoch seconds (defaults to time.time())
+
+        Returns:
+            Timestamp string with microsecond precision
+        """
+        if now is None:
+            now = time.time()
+        second = int(now)
+        cached_second, prefix = self._ts_cache
+        if second != cached_second:
+            prefix = time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(second))
+            self._ts_cache = (second, prefix)
+        return f"{prefix}.{int((now - second) * 1_000_000):06d}"
 
     def start_query(self, user_input: str) -> str:
         """
@@ -120,7 +491,8 @@ class PerformanceMonitor:
             return
 
         # Calculate response time
-        response_time_ms = (time.time() - self._current_query_start) * 1000
+        end_time = time.time()
+        response_time_ms = (end_time - self._current_query_start) * 1000
 
         # Store last response for feedback
         self._last_response = response
@@ -128,8 +500,8 @@ class PerformanceMonitor:
         # Create query record
         query_record = {
             "id": query_id,
-            "timestamp": datetime.now().isoformat(),
-            "user_input": user_input[:200],  # Truncate long inputs
+            "timestamp": self._timestamp(end_time),
+            "user_input": _truncate(user_input),  # Truncate long inputs
             "response_time_ms": round(response_time_ms, 2),
             "was_direct_command": was_direct_command,
             "had_fallback": had_fallback,
@@ -139,24 +511,8 @@ class PerformanceMonitor:
             "feedback": None  # Will be updated if user provides feedback
         }
 
-        with self._lock:
-            # Add to queries list
-            self.metrics["queries"].append(query_record)
-
-            # Update statistics
-            self.metrics["statistics"]["total_queries"] += 1
-
-            if error:
-                self.metrics["statistics"]["total_errors"] += 1
-
-            # Update average response time
-            all_times = [q["response_time_ms"] for q in self.metrics["queries"]]
-            self.metrics["statistics"]["avg_response_time_ms"] = round(
-                statistics.mean(all_times), 2
-            )
-
-        # Save asynchronously (non-blocking)
-        self._save_metrics()
+        # Hand off to the flusher (non-blocking, no lock)
+        self._post("query", query_record)
 
         # Reset current query
         self._current_query_start = None
@@ -171,22 +527,13 @@ class PerformanceMonitor:
             success: Whether Claude was successfully reached
         """
         fallback_record = {
-            "timestamp": datetime.now().isoformat(),
-            "user_input": user_input[:200],
+            "timestamp": self._timestamp(),
+            "user_input": _truncate(user_input),
             "local_confidence": local_confidence,
             "success": success
         }
 
-        with self._lock:
-            self.metrics["fallbacks"].append(fallback_record)
-            self.metrics["statistics"]["total_fallbacks"] += 1
-
-            # Update last query with fallback info
-            if self.metrics["queries"]:
-                self.metrics["queries"][-1]["had_fallback"] = True
-                self.metrics["queries"][-1]["fallback_success"] = success
-
-        self._save_metrics()
+        self._post("fallback", fallback_record)
 
     def record_error(self, error_type: str, error_message: str, context: Optional[str] = None):
         """
@@ -198,21 +545,13 @@ class PerformanceMonitor:
             context: Additional context
         """
         error_record = {
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": self._timestamp(),
             "type": error_type,
-            "message": error_message,
+            "message": _truncate(error_message),
             "context": context
         }
 
-        with self._lock:
-            self.metrics["errors"].append(error_record)
-            self.metrics["statistics"]["total_errors"] += 1
-
-            # Keep only last 100 errors to prevent file bloat
-            if len(self.metrics["errors"]) > 100:
-                self.metrics["errors"] = self.metrics["errors"][-100:]
-
-        self._save_metrics()
+        self._post("error", error_record)
 
     def record_feedback(self, is_correct: bool, note: Optional[str] = None):
         """
@@ -227,17 +566,7 @@ class PerformanceMonitor:
         """
         feedback_type = "correct" if is_correct else "incorrect"
 
-        with self._lock:
-            # Update feedback counts
-            self.metrics["feedback"][feedback_type] += 1
-
-            # Update last query with feedback and note
-            if self.metrics["queries"]:
-                self.metrics["queries"][-1]["feedback"] = feedback_type
-                if note:
-                    self.metrics["queries"][-1]["feedback_note"] = note
-
-        self._save_metrics()
+        self._post("feedback", (feedback_type, note))
 
         return feedback_type
 
@@ -248,7 +577,11 @@ class PerformanceMonitor:
         Returns:
             Formatted summary string
         """
+        from statistics import mean
+
         with self._lock:
+            self._drain_events()
+
             stats = self.metrics["statistics"]
             feedback = self.metrics["feedback"]
             total_queries = stats["total_queries"]
@@ -262,102 +595,72 @@ class PerformanceMonitor:
             fallback_rate = (stats["total_fallbacks"] / total_queries * 100) if total_queries > 0 else 0
 
             # Recent response times
-            recent_queries = self.metrics["queries"][-10:]
-            recent_times = [q["response_time_ms"] for q in recent_queries]
+            recent_times = list(self._recent_times)
 
             # Calculate response time stats
             if recent_times:
                 min_time = min(recent_times)
                 max_time = max(recent_times)
-                avg_recent = statistics.mean(recent_times)
+                avg_recent = mean(recent_times)
             else:
                 min_time = max_time = avg_recent = 0.0
 
             # Direct command vs LLM breakdown
-            direct_commands = sum(1 for q in self.metrics["queries"] if q["was_direct_command"])
+            direct_commands = stats["direct_commands"]
             llm_queries = total_queries - direct_commands
 
             # Source breakdown
-            source_counts = {"local": 0, "perplexity": 0, "claude": 0}
-            for q in self.metrics["queries"]:
-                source = q.get("source", "local")
-                if source in source_counts:
-                    source_counts[source] += 1
+            source_counts = stats["source_counts"]
 
             # Recent errors
             recent_errors = self.metrics["errors"][-5:]
 
             # Build report
-            report = f"""
-╔══════════════════════════════════════════════════════════════╗
-║           🧬 GENESIS PERFORMANCE METRICS                      ║
-╚══════════════════════════════════════════════════════════════╝
-
-📊 OVERALL STATISTICS
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-Total Queries Processed:        {total_queries}
-  • Direct Commands (instant):  {direct_commands}
-  • LLM Queries (20-30s):        {llm_queries}
-
-🌐 RESPONSE SOURCES
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-  🧬 Local (Genesis):           {source_counts['local']}
-  🔍 Perplexity Research:       {source_counts['perplexity']}
-  ☁️  Claude Fallback:           {source_counts['claude']}
-
-⚡ RESPONSE SPEED
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-Average Response Time:          {stats['avg_response_time_ms']:.2f} ms
-Recent (Last 10):
-  • Fastest:                    {min_time:.2f} ms
-  • Slowest:                    {max_time:.2f} ms
-  • Average:                    {avg_recent:.2f} ms
-
-✅ USER FEEDBACK
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-Total Feedback Given:           {total_feedback}
-  ✓ Correct (#correct):         {feedback['correct']} ({correct_pct:.1f}%)
-  ✗ Incorrect (#incorrect):     {feedback['incorrect']} ({incorrect_pct:.1f}%)
-
-🤖 CLAUDE FALLBACK
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-Total Fallbacks:                {stats['total_fallbacks']}
-Fallback Rate:                  {fallback_rate:.1f}%
-Recent Fallbacks:               {len([f for f in self.metrics['fallbacks'][-10:]])}
-"""
+            report = io.StringIO()
+            report.write(_REPORT_TEMPLATE.format_map({
+                "total_queries": total_queries,
+                "direct_commands": direct_commands,
+                "llm_queries": llm_queries,
+                "source_counts": source_counts,
+                "avg_response_time_ms": stats["avg_response_time_ms"],
+                "min_time": min_time,
+                "max_time": max_time,
+                "avg_recent": avg_recent,
+                "total_feedback": total_feedback,
+                "correct": feedback["correct"],
+                "correct_pct": correct_pct,
+                "incorrect": feedback["incorrect"],
+                "incorrect_pct": incorrect_pct,
+                "total_fallbacks": stats["total_fallbacks"],
+                "fallback_rate": fallback_rate,
+                "recent_fallbacks": len(self.metrics["fallbacks"][-10:])
+            }))
 
             # Add fallback success rate if we have fallbacks
             if self.metrics["fallbacks"]:
                 successful = sum(1 for f in self.metrics["fallbacks"] if f["success"])
                 success_rate = (successful / len(self.metrics["fallbacks"]) * 100)
-                report += f"Claude Reachability:            {success_rate:.1f}%\n"
+                report.write(f"Claude Reachability:            {success_rate:.1f}%\n")
 
             # Add error section
-            report += f"""
-⚠️  ERRORS & ISSUES
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-Total Errors:                   {stats['total_errors']}
-Recent Errors (Last 5):
-"""
+            report.write(_ERRORS_TEMPLATE.format(total_errors=stats["total_errors"]))
 
             if recent_errors:
                 for i, error in enumerate(recent_errors, 1):
                     timestamp = error['timestamp'].split('T')[1][:8]
-                    report += f"  {i}. [{timestamp}] {error['type']}: {error['message'][:50]}\n"
+                    report.write(f"  {i}. [{timestamp}] {error['type']}: {error['message'][:50]}\n")
             else:
-                report += "  No recent errors ✓\n"
+                report.write("  No recent errors ✓\n")
 
             # Add performance rating
-            report += "\n"
-            rating = self._calculate_performance_rating(
+            report.write("\n")
+            report.write(self._calculate_performance_rating(
                 correct_pct, stats['avg_response_time_ms'], fallback_rate
-            )
-            report += rating
+            ))
 
-            report += "\n━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n"
-            report += "Commands: #correct | #incorrect | #performance | #reset_metrics\n"
+            report.write(_REPORT_FOOTER)
 
-            return report
+            return report.getvalue()
 
     def _calculate_performance_rating(
         self,
@@ -412,9 +715,10 @@ Component Scores:
 
     def reset_metrics(self):
         """Reset all metrics to initial state"""
-        with self._lock:
+        # The write lock keeps the flusher off the query log while it's replaced
+        with self._write_lock, self._lock:
+            self._drain_events()
             self.metrics = {
-                "queries": [],
                 "fallbacks": [],
                 "errors": [],
                 "feedback": {
@@ -425,10 +729,23 @@ Component Scores:
                     "total_queries": 0,
                     "total_fallbacks": 0,
                     "total_errors": 0,
-                    "avg_response_time_ms": 0.0
+                    "avg_response_time_ms": 0.0,
+                    "direct_commands": 0,
+                    "source_counts": {"local": 0, "perplexity": 0, "claude": 0}
                 },
                 "session_start": datetime.now().isoformat()
             }
+            self._queries.clear()
+            self._recent_times.clear()
+
+            # Start a new query log so older records don't resurface
+            if self._archive is not None:
+                self._archive.close()
+                self._archive = None
+            try:
+                self._archive_file.unlink(missing_ok=True)
+            except Exception as e:
+                print(f"⚠ Could not clear query log: {e}")
 
         self._save_metrics()
 
@@ -443,11 +760,24 @@ Component Scores:
             List of query records
         """
         with self._lock:
-            return self.metrics["queries"][-count:]
+            self._drain_events()
+            start = max(0, len(self._queries) - count)
+            recent = list(islice(self._queries, start, None))
+            missing = count - len(recent)
+            archive_end = self._archive_end() if missing > 0 else 0
+
+        # Older records only exist in the query log (read outside the lock)
+        if archive_end:
+            try:
+                recent = self._read_archive_tail(missing, archive_end) + recent
+            except Exception as e:
+                print(f"⚠ Could not read query log: {e}")
+
+        return recent
 
     def export_metrics(self, output_file: Optional[str] = None) -> str:
         """
-        Export metrics to file
+        Export metrics, including the full query history from the query log, to file
 
         Args:
             output_file: Output file path (defaults to timestamped file)
@@ -463,7 +793,19 @@ Component Scores:
         output_path.parent.mkdir(parents=True, exist_ok=True)
 
         with self._lock:
-            with open(output_path, 'w') as f:
-                json.dump(self.metrics, f, indent=2)
+            self._drain_events()
+            snapshot = _dumps(self._snapshot())
+            archive_end = self._archive_end()
+
+        # Older records only exist in the query log (read outside the lock)
+        snapshot = json.loads(snapshot)
+        try:
+            snapshot["queries"] = self._read_archive(archive_end) + snapshot["queries"]
+        except Exception as e:
+            print(f"⚠ Could not read query log: {e}")
+        data = _dumps(snapshot, pretty=True)
+
+        with open(output_path, 'wb') as f:
+            f.write(data)
 
         return str(output_path)
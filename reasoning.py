@@ -4,12 +4,38 @@ Genesis Reasoning Module
 Multi-step reasoning with pseudocode generation and validation
 """
 
+import functools
+import io
 import re
+import sys
 from typing import List, Dict, Tuple, Optional
 from dataclasses import dataclass
 from math_reasoner import MathReasoner
 
-@dataclass
+# Keyword regexes use re2 (linear-time, no backtracking) when it's installed
+try:
+    import re2 as _keyword_re
+except ImportError:
+    _keyword_re = re
+
+# Keywords containing any of these are treated as regexes, the rest as literals
+_REGEX_METACHARS = re.compile(r'[.*+?^${}()|\[\]\\]')
+
+# "first.*second" keywords made of two literals are checked with str.find
+_ORDERED_PAIR = re.compile(r'^([^.*+?^${}()|\[\]\\]+)\.\*([^.*+?^${}()|\[\]\\]+)$')
+
+# Problem-type identifiers, interned once and shared by detection and dispatch
+_PT_MATH = sys.intern("math_word_problem")
+_PT_LOGIC = sys.intern("logic_problem")
+_PT_PROGRAMMING = sys.intern("programming")
+_PT_DESIGN = sys.intern("design")
+_PT_METACOGNITIVE = sys.intern("metacognitive")
+_PT_GENERAL = sys.intern("general")
+
+# Order in which detect_problem_type tries each pattern
+_PATTERN_PRIORITY = (_PT_METACOGNITIVE, _PT_MATH, _PT_LOGIC, _PT_PROGRAMMING, _PT_DESIGN, _PT_GENERAL)
+
+@dataclass(frozen=True, slots=True)
 class ReasoningStep:
     """Single reasoning step"""
     step_num: int
@@ -17,13 +43,257 @@ class ReasoningStep:
     calculation: Optional[str] = None
     result: Optional[str] = None
 
+_TRACE_SEPARATOR = "─" * 60
+
+# Answer words that suggest a math problem (see validate_reasoning)
+_MATH_ANSWER_WORDS = ("number", "calculate", "sum")
+
+# Static reasoning step templates (shared, immutable ReasoningStep instances)
+_MATH_TEMPLATE_STEPS = (
+    ReasoningStep(
+        step_num=1,
+        description="Identify the given information",
+        calculation="Extract all numbers and relationships from the problem statement"
+    ),
+    ReasoningStep(
+        step_num=2,
+        description="Determine what needs to be calculated",
+        calculation="Identify the unknown variable and what formula applies"
+    ),
+    ReasoningStep(
+        step_num=3,
+        description="Set up the mathematical relationship",
+        calculation="Write out the equation with variables defined"
+    ),
+    ReasoningStep(
+        step_num=4,
+        description="Perform the calculation step-by-step",
+        calculation="Show all arithmetic operations with intermediate results"
+    ),
+    ReasoningStep(
+        step_num=5,
+        description="Verify the answer",
+        calculation="Substitute back into original constraints to check correctness"
+    )
+)
+
+_LOGIC_STEPS = (
+    ReasoningStep(
+        step_num=1,
+        description="Extracting premises",
+        calculation="Identifying all given statements and conditions from the problem"
+    ),
+    ReasoningStep(
+        step_num=2,
+        description="Clarifying the goal",
+        calculation="Determining what conclusion needs to be proven or derived"
+    ),
+    ReasoningStep(
+        step_num=3,
+        description="Analyzing logical connections",
+        calculation="Examining how premises relate to each other and to the desired conclusion"
+    ),
+    ReasoningStep(
+        step_num=4,
+        description="Applying logical rules",
+        calculation="Using logical inference rules (transitivity, modus ponens, contradiction, etc.)"
+    ),
+    ReasoningStep(
+        step_num=5,
+        description="Stating conclusion with proof",
+        calculation="Presenting the final conclusion with step-by-step logical justification"
+    )
+)
+
+_PROGRAMMING_STEPS = (
+    ReasoningStep(
+        step_num=1,
+        description="Analyzing input requirements",
+        calculation="Examining the data types and constraints specified in the problem"
+    ),
+    ReasoningStep(
+        step_num=2,
+        description="Planning required operations",
+        calculation="Breaking down the problem into logical operations"
+    ),
+    ReasoningStep(
+        step_num=3,
+        description="Designing algorithm structure",
+        calculation="Creating step-by-step logical flow for the solution"
+    ),
+    ReasoningStep(
+        step_num=4,
+        description="Identifying edge cases",
+        calculation="Considering boundary conditions and special scenarios"
+    ),
+    ReasoningStep(
+        step_num=5,
+        description="Implementing solution",
+        calculation="Translating algorithm into working code"
+    )
+)
+
+_DESIGN_STEPS = (
+    ReasoningStep(
+        step_num=1,
+        description="Analyzing requirements",
+        calculation="Examining the core problem and objectives to be addressed"
+    ),
+    ReasoningStep(
+        step_num=2,
+        description="Identifying system components",
+        calculation="Breaking down the system into logical modules and services"
+    ),
+    ReasoningStep(
+        step_num=3,
+        description="Defining component interactions",
+        calculation="Establishing interfaces, APIs, and data flow between components"
+    ),
+    ReasoningStep(
+        step_num=4,
+        description="Evaluating constraints and trade-offs",
+        calculation="Balancing performance, scalability, and maintainability requirements"
+    ),
+    ReasoningStep(
+        step_num=5,
+        description="Creating design specification",
+        calculation="Documenting the complete architecture with diagrams and details"
+    )
+)
+
+_METACOGNITIVE_STEPS = (
+    ReasoningStep(
+        step_num=1,
+        description="Analyzing meta-question or feedback",
+        calculation="Determining if this is feedback on a previous response, a capability inquiry, or a retry request"
+    ),
+    ReasoningStep(
+        step_num=2,
+        description="Identifying relevant system capabilities",
+        calculation="Mapping to Genesis features: memory systems, reasoning engine, external sources, or known limitations"
+    ),
+    ReasoningStep(
+        step_num=3,
+        description="Diagnosing the issue or request",
+        calculation="For feedback: categorizing error type. For capability questions: listing relevant features like persistent memory, pruning, context handling, fallback chain"
+    ),
+    ReasoningStep(
+        step_num=4,
+        description="Formulating response strategy",
+        calculation="Preparing actionable next steps: retry with corrections, explain limitations with workarounds, or describe capabilities with examples"
+    )
+)
+
+_GENERAL_STEPS = (
+    ReasoningStep(
+        step_num=1,
+        description="Parsing the question",
+        calculation="Analyzing the query to identify the core information request"
+    ),
+    ReasoningStep(
+        step_num=2,
+        description="Gathering relevant information",
+        calculation="Accessing available facts, data, and context from knowledge base and memory"
+    ),
+    ReasoningStep(
+        step_num=3,
+        description="Applying logical reasoning",
+        calculation="Connecting information through logical inference to derive conclusions"
+    ),
+    ReasoningStep(
+        step_num=4,
+        description="Formulating complete answer",
+        calculation="Synthesizing findings into a clear, coherent response"
+    )
+)
+
+# Pre-joined pseudocode templates, picked by the first matching rule
+_PSEUDOCODE_HEADER = "PSEUDOCODE:\n──────────────────\n"
+
+_PSEUDOCODE_RULES = (
+    (
+        lambda q: "sum" in q and ("even" in q or "odd" in q),
+        _PSEUDOCODE_HEADER + "\n".join([
+            "FUNCTION sum_filtered(list):",
+            "  SET total = 0",
+            "  FOR each element IN list:",
+            "    IF element meets condition:",
+            "      ADD element TO total",
+            "  RETURN total",
+            "END FUNCTION"
+        ])
+    ),
+    (
+        lambda q: "reverse" in q,
+        _PSEUDOCODE_HEADER + "\n".join([
+            "FUNCTION reverse(input):",
+            "  INITIALIZE result as empty",
+            "  FOR each element IN input (backwards):",
+            "    APPEND element TO result",
+            "  RETURN result",
+            "END FUNCTION"
+        ])
+    ),
+    (
+        lambda q: "sort" in q or "order" in q,
+        _PSEUDOCODE_HEADER + "\n".join([
+            "FUNCTION sort(list):",
+            "  FOR i FROM 0 TO length(list)-1:",
+            "    FOR j FROM i+1 TO length(list):",
+            "      IF list[i] > list[j]:",
+            "        SWAP list[i] AND list[j]",
+            "  RETURN list",
+            "END FUNCTION"
+        ])
+    ),
+    (
+        lambda q: "search" in q or "find" in q,
+        _PSEUDOCODE_HEADER + "\n".join([
+            "FUNCTION search(list, target):",
+            "  FOR each element IN list:",
+            "    IF element EQUALS target:",
+            "      RETURN index of element",
+            "  RETURN not found",
+            "END FUNCTION"
+        ])
+    ),
+)
+
+_PSEUDOCODE_GENERIC = _PSEUDOCODE_HEADER + "\n".join([
+    "FUNCTION solve_problem(input):",
+    "  // Step 1: Parse/validate input",
+    "  // Step 2: Initialize variables",
+    "  // Step 3: Process data",
+    "  // Step 4: Handle edge cases",
+    "  // Step 5: Return result",
+    "END FUNCTION"
+])
+
 class ReasoningEngine:
     """Handles multi-step reasoning and pseudocode generation"""
 
     def __init__(self):
         """Initialize reasoning engine"""
-        self.current_trace = []
+        self.current_trace: Tuple[ReasoningStep, ...] = ()  # Immutable, safe to share
         self.reasoning_patterns = self._load_patterns()
+        self._lower_cache = (None, "")  # (query, query.lower()) for the last query seen
+
+        # Memoized pure helpers, keyed on the lowercased query
+        self._detect_cached = functools.lru_cache(maxsize=4096)(self._detect_problem_type)
+        self._pseudocode_cached = functools.lru_cache(maxsize=1024)(self._generate_pseudocode)
+        # Solved math traces, keyed on the exact query (the numbers matter)
+        self._math_cached = functools.lru_cache(maxsize=256)(self._solve_math_problem)
+        # Rendered traces, keyed on the (hashable, frozen) step tuple
+        self._format_cached = functools.lru_cache(maxsize=256)(self._format_trace)
+
+        # Problem type -> step generator; anything else falls back to _reason_general
+        self._dispatch = {
+            _PT_MATH: self._reason_math_problem,
+            _PT_LOGIC: self._reason_logic_problem,
+            _PT_PROGRAMMING: self._reason_programming_problem,
+            _PT_DESIGN: self._reason_design_problem,
+            _PT_METACOGNITIVE: self._reason_metacognitive,
+        }
         self.math_reasoner = MathReasoner()
         self.last_math_answer = None
         self.last_math_solution = None
@@ -43,12 +313,29 @@ class ReasoningEngine:
             self.last_math_answer = None
             self.last_math_solution = None
             self.current_question_id = question_id
-            self.current_trace = []
+            self.current_trace = ()
+
+    def _lower(self, query: str) -> str:
+        """
+        Lowercase a query, reusing the result when the same query object is
+        passed again (classify_query and detect_problem_type run back to back)
+
+        Args:
+            query: User's query
+
+        Returns:
+            Lowercased query
+        """
+        cached_query, cached_lower = self._lower_cache
+        if query is not cached_query:
+            cached_lower = query.lower()
+            self._lower_cache = (query, cached_lower)
+        return cached_lower
 
     def _load_patterns(self) -> Dict:
         """Load reasoning patterns for different problem types"""
-        return {
-            "math_word_problem": {
+        patterns = {
+            _PT_MATH: {
                 "keywords": ["if", "how many", "how much", "calculate", "total", "rate", "per", "cost", "all but", "machines?.*package", "required", "needs? to"],
                 "steps": [
                     "Identify the given information",
@@ -58,7 +345,7 @@ class ReasoningEngine:
                     "Verify the answer makes sense"
                 ]
             },
-            "logic_problem": {
+            _PT_LOGIC: {
                 "keywords": ["implies", "if.*then", "therefore", "because", "consequently"],
                 "steps": [
                     "Identify the premises",
@@ -68,7 +355,7 @@ class ReasoningEngine:
                     "State the final conclusion"
                 ]
             },
-            "programming": {
+            _PT_PROGRAMMING: {
                 "keywords": ["write", "function", "code", "implement", "algorithm"],
                 "steps": [
                     "Identify input types and constraints",
@@ -78,7 +365,7 @@ class ReasoningEngine:
                     "Implement the solution"
                 ]
             },
-            "design": {
+            _PT_DESIGN: {
                 "keywords": ["design", "architect", "structure", "system", "plan"],
                 "steps": [
                     "Understand requirements",
@@ -88,7 +375,7 @@ class ReasoningEngine:
                     "Produce design specification"
                 ]
             },
-            "metacognitive": {
+            _PT_METACOGNITIVE: {
                 "keywords": ["#incorrect", "#correct", "limitation", "how do you", "what can you", "explain yourself", "retry", "try again"],
                 "steps": [
                     "Understand the meta-question or feedback",
@@ -99,6 +386,25 @@ class ReasoningEngine:
             }
         }
 
+        # Split keywords into plain substrings (checked with `in`), ordered
+        # literal pairs like "if.*then" (checked with str.find) and one
+        # pre-compiled alternation of the remaining regexes per problem type
+        for pattern in patterns.values():
+            literals, ordered_pairs, regexes = [], [], []
+            for kw in pattern["keywords"]:
+                pair = _ORDERED_PAIR.match(kw)
+                if pair:
+                    ordered_pairs.append(pair.groups())
+                elif _REGEX_METACHARS.search(kw):
+                    regexes.append(kw)
+                else:
+                    literals.append(kw)
+            pattern["literals"] = literals
+            pattern["ordered_pairs"] = ordered_pairs
+            pattern["regex"] = _keyword_re.compile("|".join(regexes)) if regexes else None
+
+        return patterns
+
     def classify_query(self, query: str) -> tuple:
         """
         Classify query into intent categories for routing to appropriate handler
@@ -109,7 +415,7 @@ class ReasoningEngine:
         Returns:
             Tuple of (query_type, confidence_score, metadata)
         """
-        query_lower = query.lower()
+        query_lower = self._lower(query)
 
         # Temporal/time-sensitive keywords
         temporal_keywords = [
@@ -198,24 +504,30 @@ class ReasoningEngine:
         Returns:
             Problem type identifier
         """
-        query_lower = query.lower()
+        return self._detect_cached(self._lower(query))
 
+    def _detect_problem_type(self, query_lower: str) -> str:
+        """Uncached detect_problem_type body (takes the lowercased query)"""
         # Priority check for metacognitive queries (feedback, self-reflection)
         if query_lower.startswith('#incorrect') or query_lower.startswith('#correct'):
-            return "metacognitive"
+            return _PT_METACOGNITIVE
 
         # Check each pattern with priority
-        pattern_priority = ["metacognitive", "math_word_problem", "logic_problem", "programming", "design", "general"]
-
-        for prob_type in pattern_priority:
+        for prob_type in _PATTERN_PRIORITY:
             if prob_type in self.reasoning_patterns:
                 pattern = self.reasoning_patterns[prob_type]
-                for keyword in pattern["keywords"]:
-                    if re.search(keyword, query_lower):
+                for literal in pattern["literals"]:
+                    if literal in query_lower:
+                        return prob_type
+                for first, second in pattern["ordered_pairs"]:
+                    start = query_lower.find(first)
+                    if start >= 0 and query_lower.find(second, start + len(first)) >= 0:
                         return prob_type
+                if pattern["regex"] and pattern["regex"].search(query_lower):
+                    return prob_type
 
         # Default to general reasoning
-        return "general"
+        return _PT_GENERAL
 
     def generate_reasoning_trace(self, query: str, problem_type: Optional[str] = None) -> List[ReasoningStep]:
         """
@@ -231,245 +543,76 @@ class ReasoningEngine:
         if problem_type is None:
             problem_type = self.detect_problem_type(query)
 
-        steps = []
-
-        if problem_type == "math_word_problem":
-            steps = self._reason_math_problem(query)
-        elif problem_type == "logic_problem":
-            steps = self._reason_logic_problem(query)
-        elif problem_type == "programming":
-            steps = self._reason_programming_problem(query)
-        elif problem_type == "design":
-            steps = self._reason_design_problem(query)
-        elif problem_type == "metacognitive":
-            steps = self._reason_metacognitive(query)
-        else:
-            steps = self._reason_general(query)
+        steps = self._dispatch.get(problem_type, self._reason_general)(query)
 
-        self.current_trace = steps
+        self.current_trace = tuple(steps)
         return steps
 
     def _reason_math_problem(self, query: str) -> List[ReasoningStep]:
         """Generate reasoning for math word problems with ACTUAL calculations"""
-        steps = []
+        solved = self._math_cached(query)
+
+        if solved:
+            steps, answer, solution = solved
+            # Store the actual answer for later use. The solution is shared
+            # with the cache, so hand out a copy and restore the reasoner's
+            # steps in case this was a cache hit
+            self.last_math_answer = answer
+            self.last_math_solution = dict(solution)
+            self.math_reasoner.steps = list(solution['steps'])
+            return list(steps)
+
+        # Fall back to generic template with emphasis on showing work
+        self.last_math_answer = None
+        return list(_MATH_TEMPLATE_STEPS)
 
-        # Try to use math reasoner for automatic solving
-        solution = self.math_reasoner.detect_and_solve(query)
+    def _solve_math_problem(self, query: str) -> Optional[Tuple[Tuple[ReasoningStep, ...], object, Dict]]:
+        """
+        Solve a math word problem with the math reasoner (memoized per query)
 
-        if solution and 'steps' in solution:
-            # Convert MathStep objects to ReasoningStep objects
-            for math_step in solution['steps']:
-                steps.append(ReasoningStep(
-                    step_num=math_step.step_num,
-                    description=math_step.description,
-                    calculation=math_step.calculation if math_step.calculation else math_step.formula,
-                    result=str(math_step.result) if math_step.result else None
-                ))
-            # Store the actual answer for later use
-            self.last_math_answer = solution.get('answer') or solution.get('smaller_item')
-            self.last_math_solution = solution
-        else:
-            # Fall back to generic template with emphasis on showing work
-            steps.append(ReasoningStep(
-                step_num=1,
-                description="Identify the given information",
-                calculation="Extract all numbers and relationships from the problem statement"
-            ))
-
-            steps.append(ReasoningStep(
-                step_num=2,
-                description="Determine what needs to be calculated",
-                calculation="Identify the unknown variable and what formula applies"
-            ))
-
-            steps.append(ReasoningStep(
-                step_num=3,
-                description="Set up the mathematical relationship",
-                calculation="Write out the equation with variables defined"
-            ))
-
-            steps.append(ReasoningStep(
-                step_num=4,
-                description="Perform the calculation step-by-step",
-                calculation="Show all arithmetic operations with intermediate results"
-            ))
-
-            steps.append(ReasoningStep(
-                step_num=5,
-                description="Verify the answer",
-                calculation="Substitute back into original constraints to check correctness"
-            ))
-            self.last_math_answer = None
+        Args:
+            query: User's query
 
-        return steps
+        Returns:
+            (steps, answer, solution) or None if the problem wasn't recognized;
+            the cached solution dict must be treated as read-only
+        """
+        # Try to use math reasoner for automatic solving
+        solution = self.math_reasoner.detect_and_solve(query)
+        if not solution or 'steps' not in solution:
+            return None
+
+        # Convert MathStep objects to ReasoningStep objects
+        steps = tuple(
+            ReasoningStep(
+                step_num=math_step.step_num,
+                description=math_step.description,
+                calculation=math_step.calculation if math_step.calculation else math_step.formula,
+                result=str(math_step.result) if math_step.result else None
+            )
+            for math_step in solution['steps']
+        )
+        return steps, solution.get('answer') or solution.get('smaller_item'), solution
 
     def _reason_logic_problem(self, query: str) -> List[ReasoningStep]:
         """Generate reasoning for logic problems"""
-        steps = []
-
-        steps.append(ReasoningStep(
-            step_num=1,
-            description="Extracting premises",
-            calculation="Identifying all given statements and conditions from the problem"
-        ))
-
-        steps.append(ReasoningStep(
-            step_num=2,
-            description="Clarifying the goal",
-            calculation="Determining what conclusion needs to be proven or derived"
-        ))
-
-        steps.append(ReasoningStep(
-            step_num=3,
-            description="Analyzing logical connections",
-            calculation="Examining how premises relate to each other and to the desired conclusion"
-        ))
-
-        steps.append(ReasoningStep(
-            step_num=4,
-            description="Applying logical rules",
-            calculation="Using logical inference rules (transitivity, modus ponens, contradiction, etc.)"
-        ))
-
-        steps.append(ReasoningStep(
-            step_num=5,
-            description="Stating conclusion with proof",
-            calculation="Presenting the final conclusion with step-by-step logical justification"
-        ))
-
-        return steps
+        return list(_LOGIC_STEPS)
 
     def _reason_programming_problem(self, query: str) -> List[ReasoningStep]:
         """Generate reasoning for programming problems"""
-        steps = []
-
-        steps.append(ReasoningStep(
-            step_num=1,
-            description="Analyzing input requirements",
-            calculation="Examining the data types and constraints specified in the problem"
-        ))
-
-        steps.append(ReasoningStep(
-            step_num=2,
-            description="Planning required operations",
-            calculation="Breaking down the problem into logical operations"
-        ))
-
-        steps.append(ReasoningStep(
-            step_num=3,
-            description="Designing algorithm structure",
-            calculation="Creating step-by-step logical flow for the solution"
-        ))
-
-        steps.append(ReasoningStep(
-            step_num=4,
-            description="Identifying edge cases",
-            calculation="Considering boundary conditions and special scenarios"
-        ))
-
-        steps.append(ReasoningStep(
-            step_num=5,
-            description="Implementing solution",
-            calculation="Translating algorithm into working code"
-        ))
-
-        return steps
+        return list(_PROGRAMMING_STEPS)
 
     def _reason_design_problem(self, query: str) -> List[ReasoningStep]:
         """Generate reasoning for system design problems"""
-        steps = []
-
-        steps.append(ReasoningStep(
-            step_num=1,
-            description="Analyzing requirements",
-            calculation="Examining the core problem and objectives to be addressed"
-        ))
-
-        steps.append(ReasoningStep(
-            step_num=2,
-            description="Identifying system components",
-            calculation="Breaking down the system into logical modules and services"
-        ))
-
-        steps.append(ReasoningStep(
-            step_num=3,
-            description="Defining component interactions",
-            calculation="Establishing interfaces, APIs, and data flow between components"
-        ))
-
-        steps.append(ReasoningStep(
-            step_num=4,
-            description="Evaluating constraints and trade-offs",
-            calculation="Balancing performance, scalability, and maintainability requirements"
-        ))
-
-        steps.append(ReasoningStep(
-            step_num=5,
-            description="Creating design specification",
-            calculation="Documenting the complete architecture with diagrams and details"
-        ))
-
-        return steps
+        return list(_DESIGN_STEPS)
 
     def _reason_metacognitive(self, query: str) -> List[ReasoningStep]:
         """Generate reasoning for metacognitive/feedback queries"""
-        steps = []
-
-        steps.append(ReasoningStep(
-            step_num=1,
-            description="Analyzing meta-question or feedback",
-            calculation="Determining if this is feedback on a previous response, a capability inquiry, or a retry request"
-        ))
-
-        steps.append(ReasoningStep(
-            step_num=2,
-            description="Identifying relevant system capabilities",
-            calculation="Mapping to Genesis features: memory systems, reasoning engine, external sources, or known limitations"
-        ))
-
-        steps.append(ReasoningStep(
-            step_num=3,
-            description="Diagnosing the issue or request",
-            calculation="For feedback: categorizing error type. For capability questions: listing relevant features like persistent memory, pruning, context handling, fallback chain"
-        ))
-
-        steps.append(ReasoningStep(
-            step_num=4,
-            description="Formulating response strategy",
-            calculation="Preparing actionable next steps: retry with corrections, explain limitations with workarounds, or describe capabilities with examples"
-        ))
-
-        return steps
+        return list(_METACOGNITIVE_STEPS)
 
     def _reason_general(self, query: str) -> List[ReasoningStep]:
         """Generate general reasoning steps"""
-        steps = []
-
-        steps.append(ReasoningStep(
-            step_num=1,
-            description="Parsing the question",
-            calculation="Analyzing the query to identify the core information request"
-        ))
-
-        steps.append(ReasoningStep(
-            step_num=2,
-            description="Gathering relevant information",
-            calculation="Accessing available facts, data, and context from knowledge base and memory"
-        ))
-
-        steps.append(ReasoningStep(
-            step_num=3,
-            description="Applying logical reasoning",
-            calculation="Connecting information through logical inference to derive conclusions"
-        ))
-
-        steps.append(ReasoningStep(
-            step_num=4,
-            description="Formulating complete answer",
-            calculation="Synthesizing findings into a clear, coherent response"
-        ))
-
-        return steps
+        return list(_GENERAL_STEPS)
 
     def generate_pseudocode(self, query: str) -> str:
         """
@@ -481,66 +624,17 @@ class ReasoningEngine:
         Returns:
             Pseudocode string
         """
-        # Extract task from query
-        pseudocode_lines = []
-
-        pseudocode_lines.append("PSEUDOCODE:")
-        pseudocode_lines.append("──────────────────")
+        return self._pseudocode_cached(self._lower(query))
 
+    def _generate_pseudocode(self, query_lower: str) -> str:
+        """Uncached generate_pseudocode body (takes the lowercased query)"""
         # Determine if it's about a specific data structure operation
-        query_lower = query.lower()
-
-        if "sum" in query_lower and ("even" in query_lower or "odd" in query_lower):
-            pseudocode_lines.extend([
-                "FUNCTION sum_filtered(list):",
-                "  SET total = 0",
-                "  FOR each element IN list:",
-                "    IF element meets condition:",
-                "      ADD element TO total",
-                "  RETURN total",
-                "END FUNCTION"
-            ])
-        elif "reverse" in query_lower:
-            pseudocode_lines.extend([
-                "FUNCTION reverse(input):",
-                "  INITIALIZE result as empty",
-                "  FOR each element IN input (backwards):",
-                "    APPEND element TO result",
-                "  RETURN result",
-                "END FUNCTION"
-            ])
-        elif "sort" in query_lower or "order" in query_lower:
-            pseudocode_lines.extend([
-                "FUNCTION sort(list):",
-                "  FOR i FROM 0 TO length(list)-1:",
-                "    FOR j FROM i+1 TO length(list):",
-                "      IF list[i] > list[j]:",
-                "        SWAP list[i] AND list[j]",
-                "  RETURN list",
-                "END FUNCTION"
-            ])
-        elif "search" in query_lower or "find" in query_lower:
-            pseudocode_lines.extend([
-                "FUNCTION search(list, target):",
-                "  FOR each element IN list:",
-                "    IF element EQUALS target:",
-                "      RETURN index of element",
-                "  RETURN not found",
-                "END FUNCTION"
-            ])
-        else:
-            # Generic pseudocode structure
-            pseudocode_lines.extend([
-                "FUNCTION solve_problem(input):",
-                "  // Step 1: Parse/validate input",
-                "  // Step 2: Initialize variables",
-                "  // Step 3: Process data",
-                "  // Step 4: Handle edge cases",
-                "  // Step 5: Return result",
-                "END FUNCTION"
-            ])
-
-        return "\n".join(pseudocode_lines)
+        for matches, pseudocode in _PSEUDOCODE_RULES:
+            if matches(query_lower):
+                return pseudocode
+
+        # Generic pseudocode structure
+        return _PSEUDOCODE_GENERIC
 
     def validate_reasoning(self, steps: List[ReasoningStep], final_answer: str) -> Tuple[bool, List[str]]:
         """
@@ -566,8 +660,10 @@ class ReasoningEngine:
 
         # Check if calculations are present for math problems
         has_calculations = any(step.calculation for step in steps)
-        if not has_calculations and any(word in final_answer.lower() for word in ["number", "calculate", "sum"]):
-            warnings.append("Math problem but no explicit calculations shown")
+        if not has_calculations:
+            answer_lower = final_answer.lower()
+            if any(word in answer_lower for word in _MATH_ANSWER_WORDS):
+                warnings.append("Math problem but no explicit calculations shown")
 
         # Basic consistency check
         if not final_answer.strip():
@@ -589,28 +685,33 @@ class ReasoningEngine:
         Returns:
             Formatted string for display
         """
-        lines = []
-        lines.append("\n[Thinking...]")
-        lines.append("─" * 60)
+        return self._format_cached(tuple(steps))
+
+    def _format_trace(self, steps: Tuple[ReasoningStep, ...]) -> str:
+        """Uncached format_trace_for_display body (takes the steps as a tuple)"""
+        buf = io.StringIO()
+        buf.write("\n[Thinking...]\n")
+        buf.write(_TRACE_SEPARATOR)
 
         for step in steps:
-            lines.append(f"\nStep {step.step_num}: {step.description}")
+            buf.write(f"\n\nStep {step.step_num}: {step.description}")
             if step.calculation:
-                lines.append(f"  → {step.calculation}")
+                buf.write(f"\n  → {step.calculation}")
             if step.result:
-                lines.append(f"  ✓ {step.result}")
+                buf.write(f"\n  ✓ {step.result}")
 
-        lines.append("\n" + "─" * 60)
+        buf.write("\n\n")
+        buf.write(_TRACE_SEPARATOR)
 
-        return "\n".join(lines)
+        return buf.getvalue()
 
-    def get_last_trace(self) -> List[ReasoningStep]:
-        """Get the most recent reasoning trace"""
+    def get_last_trace(self) -> Tuple[ReasoningStep, ...]:
+        """Get the most recent reasoning trace (immutable, no copy needed)"""
         return self.current_trace
 
     def clear_trace(self):
         """Clear current reasoning trace"""
-        self.current_trace = []
+        self.current_trace = ()
 
     def set_time_sync(self, time_sync):
         """
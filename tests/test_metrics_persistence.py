@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Genesis Metrics Persistence Tests
+Tests batched metric writes, the JSONL query log and restarts
+"""
+
+import sys
+import os
+import json
+import time
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import performance_monitor
+from performance_monitor import PerformanceMonitor
+
+def _record(monitor, text, **kwargs):
+    """Record one completed query"""
+    query_id = monitor.start_query(text)
+    monitor.end_query(query_id, text, "ok", **kwargs)
+
+def test_burst_is_written_once(tmp_path, monkeypatch):
+    """A burst of events within one flush interval produces a single write"""
+    metrics_file = tmp_path / "metrics.json"
+    writes = []
+    real_replace = os.replace
+
+    def counting_replace(src, dst):
+        if str(dst) == str(metrics_file):
+            writes.append(dst)
+        real_replace(src, dst)
+
+    monkeypatch.setattr(performance_monitor.os, "replace", counting_replace)
+
+    monitor = PerformanceMonitor(str(metrics_file), flush_interval=0.2)
+    time.sleep(0.3)
+    assert writes == [], "Idle monitor should not write"
+
+    for i in range(50):
+        _record(monitor, f"input{i}")
+    monitor.record_feedback(True)
+    time.sleep(0.6)
+    assert len(writes) == 1, f"Expected one write for the burst, got {len(writes)}"
+
+    monitor.close()
+    assert not monitor._flush_thread.is_alive(), "Flusher should stop on close"
+    assert len(writes) == 1, "Close should not rewrite unchanged metrics"
+
+def test_load_time_trim_is_persisted(tmp_path):
+    """Records archived while loading an oversized file are not archived twice"""
+    metrics_file = tmp_path / "metrics.json"
+    monitor = PerformanceMonitor(str(metrics_file), max_queries=150)
+    for i in range(150):
+        _record(monitor, f"input{i}")
+    monitor.close()
+
+    archive_file = metrics_file.with_suffix(".queries.jsonl")
+    for _ in range(3):
+        PerformanceMonitor(str(metrics_file), max_queries=100).close()
+
+        with open(archive_file) as f:
+            archived = [json.loads(line)["user_input"] for line in f]
+        assert archived == [f"input{i}" for i in range(50)], "Archive should hold each evicted record once"
+
+        with open(metrics_file) as f:
+            stored = [q["user_input"] for q in json.load(f)["queries"]]
+        assert stored == [f"input{i}" for i in range(50, 150)]
+
+def test_events_drained_by_reader_are_written(tmp_path):
+    """Events applied by a reader still reach disk on the next flush"""
+    metrics_file = tmp_path / "metrics.json"
+    monitor = PerformanceMonitor(str(metrics_file), flush_interval=0.1)
+
+    _record(monitor, "drained by reader")
+    assert monitor.get_recent_queries(1)[0]["user_input"] == "drained by reader"
+    time.sleep(0.4)
+
+    with open(metrics_file) as f:
+        stored = json.load(f)
+    assert [q["user_input"] for q in stored["queries"]] == ["drained by reader"]
+    assert stored["statistics"]["total_queries"] == 1
+
+    monitor.close()
+
+def test_evicted_queries_are_archived(tmp_path):
+    """Queries beyond max_queries move to the JSONL log, oldest first"""
+    metrics_file = tmp_path / "metrics.json"
+    monitor = PerformanceMonitor(str(metrics_file), max_queries=3)
+    for i in range(6):
+        _record(monitor, f"input{i}")
+    monitor.close()
+
+    with open(metrics_file) as f:
+        assert [q["user_input"] for q in json.load(f)["queries"]] == ["input3", "input4", "input5"]
+    with open(metrics_file.with_suffix(".queries.jsonl")) as f:
+        assert [json.loads(line)["user_input"] for line in f] == ["input0", "input1", "input2"]
+
+def test_recent_queries_tail_read_spans_blocks(tmp_path):
+    """get_recent_queries reads older records back across several read blocks"""
+    monitor = PerformanceMonitor(str(tmp_path / "metrics.json"), max_queries=5)
+    for i in range(60):
+        # Long error strings make each log line larger than a read block share
+        _record(monitor, f"input{i}", error="x" * 1500)
+
+    recent = monitor.get_recent_queries(40)
+    assert [q["user_input"] for q in recent] == [f"input{i}" for i in range(20, 60)]
+    monitor.close()
+
+def test_reset_clears_query_log(tmp_path):
+    """Records from before a reset are not returned afterwards"""
+    metrics_file = tmp_path / "metrics.json"
+    monitor = PerformanceMonitor(str(metrics_file), max_queries=3)
+    for i in range(6):
+        _record(monitor, f"input{i}")
+    assert len(monitor.get_recent_queries(10)) == 6
+
+    monitor.reset_metrics()
+    assert monitor.get_recent_queries(10) == []
+
+    _record(monitor, "after reset")
+    assert [q["user_input"] for q in monitor.get_recent_queries(10)] == ["after reset"]
+    monitor.close()
+
+def test_history_survives_restart(tmp_path):
+    """Recent queries and exports include archived records after a restart"""
+    metrics_file = tmp_path / "metrics.json"
+    monitor = PerformanceMonitor(str(metrics_file), max_queries=5)
+    for i in range(8):
+        _record(monitor, f"input{i}")
+    monitor.close()
+
+    monitor = PerformanceMonitor(str(metrics_file), max_queries=5)
+    _record(monitor, "input8")
+    expected = [f"input{i}" for i in range(9)]
+    assert [q["user_input"] for q in monitor.get_recent_queries(20)] == expected
+
+    export_path = monitor.export_metrics(str(tmp_path / "export.json"))
+    with open(export_path) as f:
+        exported = json.load(f)
+    assert [q["user_input"] for q in exported["queries"]] == expected
+    assert exported["statistics"]["total_queries"] == 9
+    monitor.close()
+
+def test_unserializable_value_does_not_stop_flushing(tmp_path):
+    """A record with a non-JSON value doesn't kill the flusher or block later writes"""
+    metrics_file = tmp_path / "metrics.json"
+    monitor = PerformanceMonitor(str(metrics_file), flush_interval=0.1)
+
+    query_id = monitor.start_query("odd")
+    monitor.end_query(query_id, "odd", "ok", confidence_score=object())
+    monitor.record_error("exception", "boom", context=ValueError("bad"))
+    time.sleep(0.3)
+    _record(monitor, "valid")
+    time.sleep(0.3)
+
+    assert monitor._flush_thread.is_alive(), "Flusher should survive a bad record"
+    with open(metrics_file) as f:
+        stored = json.load(f)
+    assert [q["user_input"] for q in stored["queries"]] == ["odd", "valid"]
+    monitor.close()
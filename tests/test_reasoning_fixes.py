@@ -191,6 +191,49 @@ def test_metacognitive_reasoning():
     print("\n✅ TEST 6 PASSED")
     return True
 
+def test_cached_reasoning():
+    """Test: Repeated queries served from the engine's caches match fresh results"""
+    print("\n" + "="*60)
+    print("TEST 7: Cached Reasoning Results")
+    print("="*60)
+
+    reasoning_engine = ReasoningEngine()
+
+    widgets = "If 5 machines can make 5 widgets in 5 minutes, how many machines are needed to make 100 widgets in 100 minutes?"
+    cats = "If 3 cats catch 3 mice in 3 minutes, how many cats do you need to catch 100 mice in 100 minutes?"
+
+    # Same query twice: second run is a cache hit
+    reasoning_engine.generate_reasoning_trace(widgets, "math_word_problem")
+    answer1 = reasoning_engine.get_calculated_answer()
+    math_steps1 = [step.description for step in reasoning_engine.math_reasoner.steps]
+
+    reasoning_engine.generate_reasoning_trace(cats, "math_word_problem")
+    assert reasoning_engine.get_calculated_answer() == "3", "FAIL: Second query should have its own answer"
+
+    # Mutating the handed-out solution must not leak into the cache
+    reasoning_engine.last_math_solution["answer"] = "corrupted"
+
+    steps2 = reasoning_engine.generate_reasoning_trace(widgets, "math_word_problem")
+    answer2 = reasoning_engine.get_calculated_answer()
+    math_steps2 = [step.description for step in reasoning_engine.math_reasoner.steps]
+
+    print(f"\nAnswers: {answer1} / {answer2}")
+
+    assert answer1 == answer2 == "5", f"FAIL: Cached retry produced {answer2}, expected {answer1}"
+    assert math_steps1 == math_steps2, "FAIL: Math reasoner steps not restored on cache hit"
+
+    # Detection and pseudocode are cached on the lowercased query
+    assert reasoning_engine.detect_problem_type(widgets) == reasoning_engine.detect_problem_type(widgets.upper())
+    assert reasoning_engine.generate_pseudocode("Reverse a List") == reasoning_engine.generate_pseudocode("reverse a list")
+
+    # Rendering a trace as a list or as the stored tuple gives the same text
+    rendered = reasoning_engine.format_trace_for_display(steps2)
+    assert rendered == reasoning_engine.format_trace_for_display(reasoning_engine.get_last_trace())
+    assert "Step 1:" in rendered, "FAIL: Rendered trace missing steps"
+
+    print("\n✅ TEST 7 PASSED")
+    return True
+
 def run_all_tests():
     """Run all tests and report results"""
     print("\n" + "="*60)
@@ -203,7 +246,8 @@ def run_all_tests():
         ("Bat and Ball Problem", test_bat_and_ball),
         ("Light Switch Puzzle", test_light_switch_puzzle),
         ("Retry Functionality", test_retry_functionality),
-        ("Metacognitive Reasoning", test_metacognitive_reasoning)
+        ("Metacognitive Reasoning", test_metacognitive_reasoning),
+        ("Cached Reasoning", test_cached_reasoning)
     ]
 
     passed = 0